@@ -274,7 +274,7 @@ class CreateTag(Action):
         Read cli arguments from data, create a Tag instance and
         add it to data.
         """
-        self._logger.debug('running action with %', data)
+        self._logger.debug('running action with %s', data)
         try:
             concept = data[self.CONCEPT]
             tags = data[self.TAGS]
@@ -3,6 +3,7 @@ import sys
 import json
 import pathlib
 import argparse
+import functools
 
 from fintool.actions import (
     CreateTransaction,
@@ -73,28 +74,38 @@ class ArgsParser:
         """Initialize instance with given config."""
         self._logger = LoggingHelper.get_logger(self.__class__.__name__)
         self._logger.debug('setting up parser helper')
-        self.load_parsers(config)
+        self._config = config
+        # parsers are built on demand for each command path
+        self._parsers = {}
 
-    def load_parsers(self, config):
-        """Create arg parser object."""
+    def load_parsers(self, config, cmd_path=()):
+        """Create arg parser object. Only the subparsers in cmd_path get
+        their arguments, the rest are added with their help only.
+        """
 
-        self.parser = argparse.ArgumentParser()
+        parser = argparse.ArgumentParser()
         if SUBPARSERS in config:
-            self.load_subparsers(config[SUBPARSERS], self.parser)
+            self.load_subparsers(config[SUBPARSERS], parser, cmd_path)
+        return parser
 
-    def load_subparsers(self, subparsers_config, parent_parser):
+    def load_subparsers(self, subparsers_config, parent_parser, cmd_path=()):
         """Add subparsers to parent parser recursively.
         Positional arguments:
             subparsers_config -- configuration dict for the current subparser
             parent_parser     -- parent object to add the parsers to.
+            cmd_path          -- names of the subparsers that need to be
+                                 fully loaded, starting at this level.
         """
 
         # create subparsers
         subparsers = parent_parser.add_subparsers(dest=subparsers_config[ID])
         subparsers.required = subparsers_config[REQUIRED]
+        selected = cmd_path[0] if cmd_path else None
         for subparser_config in subparsers_config[SUBPARSERS_CFGS]:
             subparser = subparsers.add_parser(
                 subparser_config[NAME], help=subparser_config[HELP])
+            if subparser_config[NAME] != selected:
+                continue  # the command is not being run, help is enough
 
             # load arguments for subparser
             for arg in subparser_config[ARGS]:
@@ -104,7 +115,31 @@ class ArgsParser:
                     subparser.add_argument(arg[ID])
 
             if SUBPARSERS in subparser_config:
-                self.load_subparsers(subparser_config[SUBPARSERS], subparser)
+                self.load_subparsers(
+                    subparser_config[SUBPARSERS], subparser, cmd_path[1:]
+                )
+
+    def get_cmd_path(self, arguments):
+        """Return a tuple with the names of the subparsers selected by the
+        leading arguments, e.g. ('txs', 'add').
+        """
+        cmd_path = []
+        config = self._config
+        for argument in arguments:
+            if SUBPARSERS not in config:
+                break
+            config = next(
+                (
+                    subparser_config
+                    for subparser_config in config[SUBPARSERS][SUBPARSERS_CFGS]
+                    if subparser_config[NAME] == argument
+                ),
+                None
+            )
+            if config is None:
+                break
+            cmd_path.append(argument)
+        return tuple(cmd_path)
 
     def parse(self, arguments):
         """Parse a list of arguments and return a dictionary with the result.
@@ -115,7 +150,13 @@ class ArgsParser:
             a dictionary with the result of argparse.ArgumentParser.parse_args
         """
         self._logger.debug('parsing arguments %s', arguments)
-        args = self.parser.parse_args(arguments)
+        cmd_path = self.get_cmd_path(arguments)
+        parser = self._parsers.get(cmd_path)
+        if parser is None:
+            parser = self._parsers[cmd_path] = self.load_parsers(
+                self._config, cmd_path
+            )
+        args = parser.parse_args(arguments)
         return vars(args)
 
 
@@ -171,16 +212,26 @@ class CLI:
         # get log level from env var or set info as default
         LoggingHelper.set_log_level(os.getenv('FINTOOL_LOGLEVEL', 'info'))
         self._logger = LoggingHelper.get_logger(self.__class__.__name__)
+        self.args_parser = self.load_args_parser()
+        self.cmd_processor = CommandProcessor()
+        ConfigManager.init()
 
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def load_args_parser(cls):
+        """Load configuration from json file and build the args parser.
+        Parsing doesn't change the parser, so it's built only once and shared
+        by all instances.
+        """
         BASE_DIR = pathlib.Path(__file__).parent
         cli_cfg_path = BASE_DIR.joinpath(CLI_CFG_FILE).resolve()
-        self._logger.debug('loading cli config from %s', cli_cfg_path)
+        LoggingHelper.get_logger(cls.__name__).debug(
+            'loading cli config from %s', cli_cfg_path
+        )
         with cli_cfg_path.open() as cfg_file:
-            self._cli_cfg = json.loads(cfg_file.read())
+            cli_cfg = json.loads(cfg_file.read())
 
-        self.args_parser = ArgsParser(self._cli_cfg[ARGS_PARSER_CFG])
-        self.cmd_processor = CommandProcessor()
-        ConfigManager.init()
+        return ArgsParser(cli_cfg[ARGS_PARSER_CFG])
 
     def parse_args(self, args):
         """
@@ -37,6 +37,7 @@ class DbFactory:
     """An utility class to create a
     db object based on parameters.
     """
+    _shared_dbs = {}
 
     @classmethod
     def get_db(cls, db_type):
@@ -55,6 +56,21 @@ class DbFactory:
         except KeyError as key_error:
             raise UnsupportedDbTypeError(f"Db type not supported: {key_error}")
 
+    @classmethod
+    def get_shared_db(cls, db_type):
+        """Return a db object matching type argument that is created on
+        first use and shared by every later caller.
+
+        Raise UnsupportedDbTypeError if type is not
+        included in SUPPORTED_TYPES variable.
+
+        Args:
+            type (str): Type of db object
+        """
+        if db_type not in cls._shared_dbs:
+            cls._shared_dbs[db_type] = cls.get_db(db_type)()
+        return cls._shared_dbs[db_type]
+
 
 class AbstractDb:
     """Abstract class to define db behavior.
@@ -63,15 +79,37 @@ class AbstractDb:
     def add_record(self, record, collection):
         pass
 
+    def add_records(self, records, collection):
+        pass
+
     def remove_record(self, id_field, id_value, collection):
         pass
 
-    def get_records(self, collection):
+    def get_records(self, collection, predicate=None):
+        pass
+
+    def iter_records(self, collection, predicate=None):
+        pass
+
+    def iter_field_values(self, field, collection):
+        pass
+
+    def find_record(self, id_field, id_value, collection):
         pass
 
     def edit_record(self, id_field, id_value, new_record, collection):
         pass
 
+    def upsert_record(self, id_field, id_value, record, collection):
+        pass
+
+    def move_record(self, id_field, id_value, record, src_collection,
+                    dst_collection):
+        pass
+
+    def write_records(self, records, collection, field_names=None):
+        pass
+
 
 class CsvDb(AbstractDb):
     """A db object that operates on csv files.
@@ -81,10 +119,12 @@ class CsvDb(AbstractDb):
     RECORDS_FILE = '{}.csv'
     RECORDS_FILE_TMP = '{}.csv.tmp'
 
-    def __init__(self, homedir=HOMEDIR):
+    def __init__(self, homedir=None):
         self._logger = LoggingHelper.get_logger(self.__class__.__name__)
         # create home dir
-        self._homedir_path = pathlib.Path(homedir).expanduser()
+        self._homedir_path = pathlib.Path(
+            homedir if homedir else self.HOMEDIR
+        ).expanduser()
         self._homedir_path.mkdir(parents=True, exist_ok=True)
         super().__init__()
 
@@ -110,6 +150,18 @@ class CsvDb(AbstractDb):
             record (dict): A dictionary representing the new record.
         """
         self._logger.debug('adding record to csv db %s', record)
+        self.add_records([record], collection)
+
+    def add_records(self, records, collection):
+        """Add a list of records into csv file opening it only once.
+
+        Args:
+            records (list): A list of dictionaries representing new records.
+        """
+        if not records:
+            return
+
+        self._logger.debug('adding %s records to csv db', len(records))
         collection_file, _ = self.create_collection_objects(collection)
         file_exists = collection_file.is_file()
         with collection_file.open(
@@ -117,12 +169,12 @@ class CsvDb(AbstractDb):
             newline='',
             encoding='utf-8'
         ) as csvfile:
-            field_names = record.keys()
+            field_names = records[0].keys()
             writer = csv.DictWriter(csvfile, fieldnames=field_names)
             # write header if file didn't exists before trying to open it.
             if not file_exists:
                 writer.writeheader()
-            writer.writerow(record)
+            writer.writerows(records)
 
     def remove_record(self, id_field, id_value, collection):
         """Remove a record from csv file.
@@ -170,14 +222,84 @@ class CsvDb(AbstractDb):
         # replace original csv with tmp file
         pathlib.Path(collection_tmp_file).replace(collection_file)
 
-    def get_records(self, collection):
-        """Return records from csv file that matches any filter in filters
+    def get_records(self, collection, predicate=None):
+        """Return the records from csv file in a list.
 
         Args:
-            filters (dict): a dictionary mapping keys with target values.
+            collection (str): The name of the collection to read.
+            predicate (callable): If given, only the records for which it
+                returns True are included.
         """
-        result = []
         self._logger.debug('getting records from db')
+        return list(self.iter_records(collection, predicate))
+
+    def iter_records(self, collection, predicate=None):
+        """Yield the records from csv file one at a time without loading the
+        whole collection into memory.
+
+        Args:
+            collection (str): The name of the collection to read.
+            predicate (callable): If given, only the records for which it
+                returns True are yielded.
+        """
+        collection_file, _ = self.create_collection_objects(collection)
+        try:
+            csvfile = collection_file.open(
+                mode='r',
+                newline='',
+                encoding='utf-8',
+            )
+        except FileNotFoundError:
+            raise MissingCollectionError(
+                f'The collection {collection} does not exist'
+            )
+
+        with csvfile:
+            reader = csv.DictReader(csvfile)
+            yield from filter(predicate, reader) if predicate else reader
+
+    def iter_field_values(self, field, collection):
+        """Yield the value of a single field from every record in csv file,
+        without building a dictionary per record. Nothing is yielded if the
+        collection has no such field.
+
+        Args:
+            field (str): The name of the field to read.
+            collection (str): The name of the collection to read.
+        """
+        collection_file, _ = self.create_collection_objects(collection)
+        try:
+            csvfile = collection_file.open(
+                mode='r',
+                newline='',
+                encoding='utf-8',
+            )
+        except FileNotFoundError:
+            raise MissingCollectionError(
+                f'The collection {collection} does not exist'
+            )
+
+        with csvfile:
+            reader = csv.reader(csvfile)
+            field_names = next(reader, [])
+            if field not in field_names:
+                return
+
+            index = field_names.index(field)
+            for row in reader:
+                if row:  # DictReader skips blank lines too
+                    yield row[index] if index < len(row) else None
+
+    def find_record(self, id_field, id_value, collection):
+        """Return the first record from csv file whose id field matches the
+        given value, or None if there is no such record. Stop reading the
+        file as soon as the record is found.
+
+        Args:
+            id_field (str): A string representing the name of id field
+            id_value (str): A string representing the value of id field
+        """
+        self._logger.debug('finding record with %s = %s', id_field, id_value)
         collection_file, _ = self.create_collection_objects(collection)
         try:
             with collection_file.open(
@@ -185,16 +307,15 @@ class CsvDb(AbstractDb):
                 newline='',
                 encoding='utf-8',
             ) as csvfile:
-                result = []
                 reader = csv.DictReader(csvfile)
-
                 for row in reader:
-                    result.append(row)
+                    if row[id_field] == id_value:
+                        return row
         except FileNotFoundError:
             raise MissingCollectionError(
                 f'The collection {collection} does not exist'
             )
-        return result
+        return None
 
     def edit_record(self, id_field, id_value, new_record, collection):
         """Update a record with a new set of values while keeping id.
@@ -247,6 +368,107 @@ class CsvDb(AbstractDb):
         # replace original csv with tmp file
         pathlib.Path(collection_tmp_file).replace(collection_file)
 
+    def upsert_record(self, id_field, id_value, record, collection):
+        """Replace the record matching the given id with a new record, or add
+        the new record if there is no match. The csv file is rewritten only
+        once.
+
+        Args:
+            id_field (str): A string representing the name of id field
+            id_value (str): A string representing the value of id field
+            record (dict): A dictionary representing the new set of values
+        """
+        self._logger.debug('upserting record %s with %s', id_value, record)
+        collection_file, collection_tmp_file = self.create_collection_objects(
+            collection
+        )
+        if not collection_file.is_file():
+            self.add_records([record], collection)
+            return
+
+        with collection_file.open(
+            mode='r',
+            newline='',
+            encoding='utf-8',
+        ) as records_csv_file:
+            # create reader and get field names
+            reader = csv.DictReader(records_csv_file)
+            field_names = reader.fieldnames if reader.fieldnames \
+                else list(record.keys())
+
+            with collection_tmp_file.open(
+                mode='w',
+                encoding='utf-8',
+                newline=''
+            ) as tmp_csv_file:
+                # create writer to dump data in tmp file
+                writer = csv.DictWriter(tmp_csv_file, fieldnames=field_names)
+                writer.writeheader()
+
+                # replace the first matching row and drop any duplicate
+                found = False
+                for row in reader:
+                    if row[id_field] != id_value:
+                        writer.writerow(row)
+                    elif not found:
+                        writer.writerow(record)
+                        found = True
+
+                if not found:
+                    writer.writerow(record)
+
+        # replace original csv with tmp file
+        pathlib.Path(collection_tmp_file).replace(collection_file)
+
+    def move_record(self, id_field, id_value, record, src_collection,
+                    dst_collection):
+        """Remove a record from a csv file and add its new values to
+        another one.
+
+        Args:
+            id_field (str): A string representing record's id field
+            id_value (str): A string representing record's id value
+            record (dict): A dictionary representing the new set of values
+            src_collection (str): The collection the record is removed from
+            dst_collection (str): The collection the record is added to
+        """
+        self._logger.debug(
+            'moving record %s from %s to %s',
+            id_value,
+            src_collection,
+            dst_collection
+        )
+        self.remove_record(id_field, id_value, src_collection)
+        self.add_record(record, dst_collection)
+
+    def write_records(self, records, collection, field_names=None):
+        """Replace the contents of csv file with the given records in a
+        single write.
+
+        Args:
+            records (list): A list of dictionaries representing the records.
+            field_names (list): The names of the columns, the keys of the
+                first record are used by default.
+        """
+        self._logger.debug('writing %s records to csv db', len(records))
+        collection_file, collection_tmp_file = self.create_collection_objects(
+            collection
+        )
+        if field_names is None:
+            field_names = list(records[0].keys()) if records else []
+
+        with collection_tmp_file.open(
+            mode='w',
+            encoding='utf-8',
+            newline=''
+        ) as tmp_csv_file:
+            writer = csv.DictWriter(tmp_csv_file, fieldnames=field_names)
+            if field_names:
+                writer.writeheader()
+            writer.writerows(records)
+
+        # replace original csv with tmp file
+        pathlib.Path(collection_tmp_file).replace(collection_file)
 
     def remove_collection(self, collection_name):
         collection_file, _ = self.create_collection_objects(collection_name)
@@ -55,6 +55,9 @@ class LoggingHelper:
     def get_logger(cls, logger_name):
         logger = logging.getLogger(logger_name)
         logger.setLevel(cls.LOG_LEVEL)
-        logger.addHandler(cls.get_console_handler())
-        logger.propagate = False
+        # loggers are shared by name, add the handler only the first time or
+        # each message would be printed once per get_logger call
+        if not logger.handlers:
+            logger.addHandler(cls.get_console_handler())
+            logger.propagate = False
         return logger
@@ -2,12 +2,17 @@
 This module provides helper classes to perform statistic analysis
 on data sets.
 """
-import datetime
 import calendar
+import itertools
+import collections
 
 from fintool.log import LoggingHelper
 
 
+# calendar.month_name does a locale lookup on every subscript
+_MONTH_NAMES = list(calendar.month_name)
+
+
 class OverallSummary:
     """A class to store and serialize a data set representing
     an overall summary.
@@ -35,23 +40,21 @@ class OverallSummary:
         return self.__data
 
     def extract_months(self):
-        response = []
-        for _, months in self.__data.items():
-            for month, _ in months.items():
-                response.append(calendar.month_name[month])
-        return response
+        return [
+            _MONTH_NAMES[month]
+            for months in self.__data.values()
+            for month in months
+        ]
 
     def extract_amount_per_tag(self):
-        amounts_per_tag = {}
-
-        for _, months in self.__data.items():
-            for _, monthly_data in months.items():
-                for tag in self.__tags:
-                    total = monthly_data['total_per_tag'].get(tag, 0)
-                    try:
-                        amounts_per_tag[tag].append(round(total, 2))
-                    except:
-                        amounts_per_tag[tag] = [round(total, 2)]
+        # one list per tag with the rounded total of every month, months
+        # without the tag count as 0
+        amounts_per_tag = {tag: [] for tag in self.__tags}
+        for months in self.__data.values():
+            for monthly_data in months.values():
+                get_total = monthly_data['total_per_tag'].get
+                for tag, amounts in amounts_per_tag.items():
+                    amounts.append(round(get_total(tag, 0), 2))
         return amounts_per_tag
 
     def extract_year(self):
@@ -69,26 +72,22 @@ class OverallSummary:
         """Create a human readable representation of the
         data encapsulated by the class.
         """
-        overall_summary = ''
+        parts = []
         for year, months in self.__data.items():
-            overall_summary = f'{overall_summary}Year: {year}\n'
+            parts.append(f'Year: {year}\n')
             for month, monthly_data in months.items():
-                month_name = f'Month: {calendar.month_name[month]}\n'
-                overall_summary = f'{overall_summary}{month_name}'
+                parts.append(f'Month: {_MONTH_NAMES[month]}\n')
 
-                transactions_str = ''.join(
-                    [str(tx) + '\n' for tx in monthly_data['transactions']]
-                )
-                overall_summary = f'{overall_summary}{transactions_str}\n'
+                # every transaction on its own line followed by a blank line
+                for tx in monthly_data['transactions']:
+                    parts.append(f'{tx}\n')
+                parts.append('\n')
 
-                # I could use list comprehension but line is too long :(
-                total_per_tag_strs = []
                 for tag, total in monthly_data['total_per_tag'].items():
-                    total_per_tag_strs.append(f'{tag}:\t{round(total, 2)}\n')
-                total_per_tag_str = ''.join(total_per_tag_strs)
-                overall_summary = f'{overall_summary}{total_per_tag_str}\n'
+                    parts.append(f'{tag}:\t{round(total, 2)}\n')
+                parts.append('\n')
 
-        return overall_summary
+        return ''.join(parts)
 
 
 class StatsHelper:
@@ -116,6 +115,12 @@ class StatsHelper:
         except KeyError:
             raise ValueError(f'unsupported stats type: {stats_type}')
 
+    @staticmethod
+    def get_month_key(transaction):
+        """Return the year-month part of the transaction date (YYYY-MM).
+        """
+        return transaction.date.rpartition('-')[0]
+
     # TODO: think how to decouple transaction structure
     # maybe init, add, finish methods and pass values as args
     def create_overall_summary(self):
@@ -132,31 +137,47 @@ class StatsHelper:
         }
         """
         self._logger.debug('creating overall summary')
-        result = {}
-        tags = set()
-        for data in self._dataset:
-            year = datetime.datetime.strptime(data.date, '%Y-%m-%d').year
-            month = datetime.datetime.strptime(data.date, '%Y-%m-%d').month
-            # add year if it doesn't exists
-            if year not in result:
-                result[year] = {}
-
-            # add month if it doesn't exists for year
-            if month not in result[year]:
-                result[year][month] = {
+        # year -> month -> bucket, buckets are created on first access
+        result = collections.defaultdict(
+            lambda: collections.defaultdict(
+                lambda: {
                     self.TRANSACTIONS: [],
-                    self.TOTAL_PER_TAG: {},
+                    self.TOTAL_PER_TAG: collections.Counter(),
                 }
-
-            # append transaction in data[year][month][transactions]
-            result[year][month][self.TRANSACTIONS].append(data)
-
-            # insert tag and current value in data[year][month][total_per_tag]
-            # or add current value to existing match
-            for tag in data.tags:
-                if tag in result[year][month][self.TOTAL_PER_TAG]:
-                    result[year][month][self.TOTAL_PER_TAG][tag] += data.amount
-                else:
-                    result[year][month][self.TOTAL_PER_TAG][tag] = data.amount
-                tags.add(tag)
-        return OverallSummary(result, tags)
+            )
+        )
+        tags = set()
+        tags_update = tags.update
+        # transactions are loaded one monthly collection at a time, so group
+        # consecutive transactions by month and resolve the month bucket once
+        # per group instead of once per transaction.
+        for month_key, group in itertools.groupby(
+            self._dataset,
+            key=self.get_month_key
+        ):
+            year, month = (int(part) for part in month_key.split('-'))
+            bucket = result[year][month]
+            transactions = bucket[self.TRANSACTIONS]
+            totals = bucket[self.TOTAL_PER_TAG]
+
+            for data in group:
+                transactions.append(data)
+
+                # add current value to the total of each tag
+                totals.update(dict.fromkeys(data.tags, data.amount))
+                tags_update(data.tags)
+
+        # hand out plain dicts, so that lookups on missing keys still fail
+        summary = {
+            year: {
+                month: {
+                    self.TRANSACTIONS: bucket[self.TRANSACTIONS],
+                    self.TOTAL_PER_TAG: dict(bucket[self.TOTAL_PER_TAG]),
+                }
+                for month, bucket in months.items()
+            }
+            for year, months in result.items()
+        }
+        # fix the order of the observed tags once so that every month is
+        # reported with the same tag order
+        return OverallSummary(summary, tuple(sorted(tags)))
@@ -40,6 +40,8 @@ class SyncDetails:
     """
     A type to define the synchronization details for the sync manager.
     """
+    __slots__ = ('provider', 'mail_boxes', 'email_type', 'start_date')
+
     def __init__(self, provider, email_type, mail_boxes, start_date):
         """
         Initialize instance.
@@ -54,6 +56,8 @@ class TaggingResult:
     """
     A class to define the result of the tagging process.
     """
+    __slots__ = ('tagged', 'untagged')
+
     def __init__(self, tagged, untagged):
         """
         Initialize instance.
@@ -71,6 +75,7 @@ class TaggedTransaction:
     EMAIL_ID = 'email_id'
     DATE = 'date'
     AMOUNT = 'amount'
+    __slots__ = ('tags', 'concept', 'email_id', 'date', 'amount')
 
     def __init__(self, **kwargs):
         self.tags = kwargs.get(self.TAGS)
@@ -98,6 +103,7 @@ class LastSync:
     """
     LAST_SYNC = 'last_sync'
     TARGET = 'target'
+    __slots__ = ('last_sync', 'target')
 
     def __init__(self, last_sync=None, target=None):
         """
@@ -106,6 +112,13 @@ class LastSync:
         self.last_sync = int(last_sync)
         self.target = target
 
+    @staticmethod
+    def build_target(provider, email_type, mail_boxes):
+        """
+        Build the string that identifies the emails a last sync belongs to.
+        """
+        return f'{provider},{email_type},{mail_boxes}'
+
     def serialize(self):
         """
         Convert instance into a dictionary.
@@ -129,9 +142,10 @@ class SyncManager:
         Initialize instance.
         """
         self._logger = LoggingHelper.get_logger(self.__class__.__name__)
-        self._tag_manager = TagManager()
-        self._transaction_manager = TransactionManager()
-        self._db = db if db else DbFactory.get_db('csv')()
+        self._db = db if db else DbFactory.get_shared_db('csv')
+        self._tag_manager = TagManager(db=self._db)
+        self._transaction_manager = TransactionManager(db=self._db)
+        self._last_syncs = {}
 
     def create_transaction_from_transaction_email(self, transaction_email):
         """
@@ -162,13 +176,13 @@ class SyncManager:
         Fetch the transaction emails using the given sync_details, tag the
         transactions and store them in the corresponding collection.
         """
+        target = LastSync.build_target(
+            sync_details.provider,
+            sync_details.email_type,
+            sync_details.mail_boxes
+        )
         try:
-            last_sync = self.get_last_sync(
-                sync_details.provider,
-                sync_details.email_type,
-                sync_details.mail_boxes,
-                self.LAST_SYNC
-            )
+            last_sync = self.get_last_sync(target, self.LAST_SYNC)
         except MissingCollectionError:
             last_sync = None  # the collection doesn't exists in first run
 
@@ -197,12 +211,7 @@ class SyncManager:
                 self.UNTAGGED_COLLECTION
             )
 
-        self.update_last_sync(
-            sync_details.provider,
-            sync_details.email_type,
-            sync_details.mail_boxes,
-            last_sync, self.LAST_SYNC
-        )
+        self.update_last_sync(target, last_sync, self.LAST_SYNC)
 
     def tag_transaction_emails(self, transaction_emails):
         """
@@ -212,8 +221,16 @@ class SyncManager:
         """
         untagged = []
         tagged = []
+        # concepts repeat a lot (same merchant), match each of them only once
+        concept_tags = {}
         for transaction_email in transaction_emails:
-            tags = self._tag_manager.match_concpet(transaction_email.concept)
+            concept = transaction_email.concept
+            if concept in concept_tags:
+                tags = concept_tags[concept]
+            else:
+                tags = self._tag_manager.match_concpet(concept)
+                concept_tags[concept] = tags
+
             if tags:
                 transaction_email.tags = tags
                 tagged.append(transaction_email)
@@ -236,10 +253,11 @@ class SyncManager:
         email_client = build_client(provider)
         email_parser = build_parser(email_type)
         emails = email_client.fetch_emails(mail_boxes, from_date)
+        parse_email = email_parser.parse_email
+        append = transaction_emails.append
         for email in emails:
             try:
-                transaction_email = email_parser.parse_email(email)
-                transaction_emails.append(transaction_email)
+                append(parse_email(email))
             except MissingFieldError:
                 continue  # TODO: think if we should do something with error
         return transaction_emails
@@ -248,8 +266,10 @@ class SyncManager:
         """
         Process a list of transactions to store them in a db collection.
         """
-        for transaction in transactions:
-            self.save_transaction(transaction)
+        # save them in one batch so each collection is written only once
+        with self._transaction_manager:
+            for transaction in transactions:
+                self.save_transaction(transaction)
 
     def save_transaction(self, transaction):
         """
@@ -262,8 +282,16 @@ class SyncManager:
         Process a list of transaction emails to persist them in the given
         collection.
         """
-        for transaction_email in transaction_emails:
-            self.save_transaction_email(transaction_email, collection)
+        if not transaction_emails:
+            return
+
+        self._db.add_records(
+            [
+                transaction_email.serialize()
+                for transaction_email in transaction_emails
+            ],
+            collection
+        )
 
     def save_transaction_email(self, transaction_email, collection):
         """
@@ -271,125 +299,114 @@ class SyncManager:
         """
         self._db.add_record(transaction_email.serialize(), collection)
 
-    def get_last_sync(self, provider, email_type, mail_boxes, collection):
+    def get_last_sync(self, target, collection):
         """
-        Get last sync from db.
+        Get last sync for the given target from db. The result is kept in
+        memory until the last sync is updated.
         """
+        if target in self._last_syncs:
+            return self._last_syncs[target]
+
         self._logger.debug('Reading last sync from db')
-        target = f'{provider},{email_type},{mail_boxes}'
-        records = self._db.get_records(collection)
-        for record in records:
+        record = self._db.find_record(LastSync.TARGET, target, collection)
+        last_sync = None
+        if record:
             try:
                 last_sync = LastSync(**record)
-                if last_sync.target == target:
-                    return last_sync
             except MissingFieldError as e:
                 raise InvalidInputObject(
                     f"Can't create Lastsync instance: {e}"
                 )
 
-        return None
-
-    def remove_last_sync(self, provider, email_type, mail_boxes, collection):
-        """
-        Remove last sync from db.
-        """
-        self._logger.debug("Removing last sync from db")
-        last_sync = self.get_last_sync(provider, email_type, mail_boxes, collection)
-        if last_sync:
-            self._db.remove_record(
-                LastSync.LAST_SYNC,
-                str(last_sync.last_sync),  # db compares this against a string
-                collection
-            )
-
-    def save_last_sync(self, provider, email_type, mail_boxes, last_sync_timestamp, collection):
-        """
-        Save last sync in db.
-        """
-        self._logger.debug("Saving last sync in db")
-        last_sync = LastSync(
-            last_sync=last_sync_timestamp,
-            target=f'{provider},{email_type},{mail_boxes}'
-        )
-        self._db.add_record(last_sync.serialize(), collection)
+        self._last_syncs[target] = last_sync
+        return last_sync
 
-    def update_last_sync(self, provider, email_type, mail_boxes, last_sync_timestamp, collection):
+    def update_last_sync(self, target, last_sync_timestamp, collection):
         """
-        Update the value of last sync in the db.
+        Update the value of last sync for the given target in the db, or add
+        it if it doesn't exist yet.
         """
         self._logger.debug("Updating last sync in db")
-        try:
-            self.remove_last_sync(provider, email_type, mail_boxes, collection)
-        except MissingCollectionError:
-            pass  # the collection doesn't exists the first time
-
-        self.save_last_sync(provider, email_type, mail_boxes, last_sync_timestamp, collection)
+        last_sync = LastSync(last_sync=last_sync_timestamp, target=target)
+        self._db.upsert_record(
+            LastSync.TARGET,
+            target,
+            last_sync.serialize(),
+            collection
+        )
+        self._last_syncs[target] = last_sync
 
     def load_untagged_transactions(self):
         """
-        Load untagged transactions from db and return a list of
-        TransactionEmail instances.
+        Load untagged transactions from db and yield them as TransactionEmail
+        instances.
         """
-        records = self._db.get_records(self.UNTAGGED_COLLECTION)
-        transaction_emails = []
-        for record in records:
-            transaction_emails.append(TransactionEmail.from_dict(record))
-
-        return transaction_emails
+        for record in self._db.iter_records(self.UNTAGGED_COLLECTION):
+            yield TransactionEmail.from_dict(record)
 
     def create_concepts_set(self):
         """
-        Process a list of TransactionEmail instances to generate a unique
-        set of concepts.
+        Read the untagged transactions to generate a unique set of concepts.
         """
-        concepts_set = set()
-        transaction_emails = self.load_untagged_transactions()
-
-        for transaction_email in transaction_emails:
-            concepts_set.add(transaction_email.concept)
-
-        return concepts_set
+        return {
+            record[TransactionEmail.CONCEPT]
+            for record in self._db.iter_records(self.UNTAGGED_COLLECTION)
+        }
 
     def load_pending_transactions(self):
         """
         Load pending transactions from db and return a list.
         """
-        records = self._db.get_records(self.PENDING_COLLECTION)
-        pending_transactions = []
-        for record in records:
-            pending_transactions.append(TaggedTransaction(**record))
-
-        return pending_transactions
+        return [
+            TaggedTransaction(**record)
+            for record in self._db.iter_records(self.PENDING_COLLECTION)
+        ]
 
     def commit_transactions(self):  # TODO: take care of duplicates
         """Move transactions from sync db to transactions db. Reset sync after
         committing transactions.
         """
-        transaction_manager = TransactionManager()
-        for tagged_transaction in self.load_pending_transactions():
-            transaction = Transaction(
+        transaction_manager = TransactionManager(db=self._db)
+        transactions = [
+            Transaction(
                 type='outcome',
                 tags=tagged_transaction.tags,
                 date=tagged_transaction.date,
                 amount=tagged_transaction.amount,
                 email_id=tagged_transaction.email_id
             )
-            transaction_manager.save_transaction(transaction)
+            for tagged_transaction in self.load_pending_transactions()
+        ]
+        transaction_manager.save_transactions(transactions)
         self._db.remove_collection(self.PENDING_COLLECTION)
 
     def tag_transactions(self):
         """
         Try to tag transactions from untagged db and save them in sync db.
         """
-        untagged_transactions = self.load_untagged_transactions()
-        tagging_result = self.tag_transaction_emails(untagged_transactions)
-        self.save_transaction_emails(
-            tagging_result.tagged,
-            self.PENDING_COLLECTION
-        )
+        records = self._db.get_records(self.UNTAGGED_COLLECTION)
+        # match every distinct concept once and split the raw records, they
+        # are written back as they are so there is no need to build
+        # TransactionEmail instances for them
+        concepts = {record[TransactionEmail.CONCEPT] for record in records}
+        concept_tags = {
+            concept: self._tag_manager.match_concpet(concept)
+            for concept in concepts
+        }
+        tagged = []
+        untagged = []
+        for record in records:
+            tags = concept_tags[record[TransactionEmail.CONCEPT]]
+            if tags:
+                record[TransactionEmail.TAGS] = '|'.join(tags)
+                tagged.append(record)
+            else:
+                untagged.append(record)
+
+        if not tagged:
+            self._logger.debug('No new transactions were tagged')
+            return  # untagged db would be rewritten with the same content
+
+        self._db.add_records(tagged, self.PENDING_COLLECTION)
         self._db.remove_collection(self.UNTAGGED_COLLECTION)
-        self.save_transaction_emails(
-            tagging_result.untagged,
-            self.UNTAGGED_COLLECTION
-        )
+        self._db.add_records(untagged, self.UNTAGGED_COLLECTION)
@@ -57,6 +57,16 @@ class Tag:
         self.tags = set(tags_str.split('|'))
         self.id = tag_id if tag_id else uuid.uuid4().hex
 
+    def copy(self):
+        """
+        Return a new Tag with the same values, including its own tags set.
+        """
+        return Tag(
+            concept=self.concept,
+            tags_str='|'.join(self.tags),
+            tag_id=self.id
+        )
+
     def serialize(self):
         """
         Convert Tag instance into a dict instance.
@@ -83,9 +93,52 @@ class TagManager:
         """
         Initialize tag manager.
         """
-        self._db = db if db else DbFactory.get_db('csv')()
+        self._db = db if db else DbFactory.get_shared_db('csv')
         self._logger = LoggingHelper.get_logger(self.__class__.__name__)
         self._tags = None
+        self._tag_index = None
+        self._tags_by_id = None
+        self._batch_depth = 0
+        self._batch_changed = False
+
+    def __enter__(self):
+        """
+        Start a batch of changes. Inside the batch tags are only changed in
+        memory, and all of them are written to db at once when it ends.
+        Nested batches join the outermost one.
+        """
+        if self._batch_depth == 0:
+            try:
+                self.load_tags()
+            except NoTagsError:
+                self._tags = []
+                self.index_tags()
+            self._batch_changed = False
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Write the changes of the batch to db when the outermost batch ends.
+        Changes are discarded if it ended with an error.
+        """
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return False
+
+        if exc_type is not None:
+            # db wasn't touched, forget the changes made in memory
+            self._tags = None
+            self._tag_index = None
+            self._tags_by_id = None
+        elif self._batch_changed:
+            self._logger.debug('Writing tag changes to tag db')
+            self._db.write_records(
+                [tag.serialize() for tag in self._tags],
+                self.TAGS_COLLECTION,
+                field_names=[Tag.F_ID, Tag.F_CONCEPT, Tag.F_TAGS]
+            )
+        return False
 
     @classmethod
     def create_tag(cls, data):
@@ -110,6 +163,17 @@ class TagManager:
         Load tags from db into memory.
         """
         self._tags = self.get_tags()
+        self.index_tags()
+
+    def index_tags(self):
+        """
+        Build a concept -> tags index and an id -> tag index from the tags in
+        memory. The first tag found for a concept wins.
+        """
+        self._tag_index = {}
+        for tag in self._tags:
+            self._tag_index.setdefault(tag.concept, tag.tags)
+        self._tags_by_id = {tag.id: tag for tag in self._tags}
 
     def match_concpet(self, concept):
         """
@@ -118,14 +182,10 @@ class TagManager:
         I/O operations when performing multiple match operations using the same
         tag manager instance.
         """
-        if not self._tags:
+        if self._tag_index is None:
             self.load_tags()
 
-        for tag in self._tags:
-            if tag.concept == concept:
-                return tag.tags
-
-        return None
+        return self._tag_index.get(concept)
 
     def add_tag(self, tag):
         """
@@ -134,21 +194,31 @@ class TagManager:
         self._logger.debug('Adding tag to tag db')
         if not isinstance(tag, Tag):
             raise InvalidTagObject(f'Invalid tag object: {type(tag)}')
-        self._db.add_record(tag.serialize(), self.TAGS_COLLECTION)
-
-        # reload tags if already loaded into memory
-        if self._tags:
-            self.load_tags()
+        if self._batch_depth:
+            self._batch_changed = True
+        else:
+            self._db.add_record(tag.serialize(), self.TAGS_COLLECTION)
+
+        # keep tags in memory up to date if already loaded, the manager keeps
+        # its own copy so that later changes to tag don't leak into it
+        if self._tags is not None:
+            tag = tag.copy()
+            self._tags.append(tag)
+            self._tag_index.setdefault(tag.concept, tag.tags)
+            self._tags_by_id[tag.id] = tag
 
     def get_tag(self, id_value):
         """
-        Return a specific tag from tags db.
+        Return a specific tag from tags db, or None if there is no tag with
+        the given id. Tags are loaded into memory on first use, and a copy of
+        the loaded tag is returned so that it can be changed safely.
         """
         self._logger.debug('Retrieving tag %s from tag db', id_value)
-        for tag in self.get_tags():
-            if tag.id == id_value:
-                return tag
-        return None
+        if self._tags_by_id is None:
+            self.load_tags()
+
+        tag = self._tags_by_id.get(id_value)
+        return tag.copy() if tag else None
 
     def get_tags(self):
         """
@@ -168,24 +238,33 @@ class TagManager:
         self._logger.debug('Updating tag %s', tag.id)
         if not isinstance(tag, Tag):
             raise InvalidTagObject(f'Invalid tag object: {type(tag)}')
-        self._db.edit_record(
-            Tag.F_ID,
-            tag.id,
-            tag.serialize(),
-            self.TAGS_COLLECTION
-        )
-
-        # reload tags if already loaded into memory
-        if self._tags:
-            self.load_tags()
+        if self._batch_depth:
+            self._batch_changed = True
+        else:
+            self._db.edit_record(
+                Tag.F_ID,
+                tag.id,
+                tag.serialize(),
+                self.TAGS_COLLECTION
+            )
+
+        # keep tags in memory up to date if already loaded
+        if self._tags is not None:
+            tag = tag.copy()
+            self._tags = [t if t.id != tag.id else tag for t in self._tags]
+            self.index_tags()
 
     def delete_tag(self, tag_id):
         """
         Remove a tag from tags db.
         """
         self._logger.debug('Removing tag %s from db', tag_id)
-        self._db.remove_record(Tag.F_ID, tag_id, self.TAGS_COLLECTION)
-
-        # reload tags if already loaded into memory
-        if self._tags:
-            self.load_tags()
+        if self._batch_depth:
+            self._batch_changed = True
+        else:
+            self._db.remove_record(Tag.F_ID, tag_id, self.TAGS_COLLECTION)
+
+        # keep tags in memory up to date if already loaded
+        if self._tags is not None:
+            self._tags = [t for t in self._tags if t.id != tag_id]
+            self.index_tags()
@@ -3,14 +3,93 @@ This module provides classes to create and manage transactions.
 """
 
 
+import sys
 import uuid
 import datetime
+import operator
+import functools
 
 from fintool.db import MissingCollectionError, DbFactory
 from fintool.log import LoggingHelper
 from fintool.errors import Error
 
 
+def _is_valid_date(date_str):
+    """
+    Return whether the given value is an existing date with YYYY-MM-DD
+    format.
+    """
+    return isinstance(date_str, str) and _is_valid_date_str(date_str)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_valid_date_str(date_str):
+    """
+    Check a YYYY-MM-DD date string without going through strptime's format
+    parsing. Many transactions share a date, so the results are cached.
+    """
+    if len(date_str) != 10 or not date_str.isascii() or \
+            date_str[4] != '-' or date_str[7] != '-':
+        return False
+
+    year, month, day = date_str[:4], date_str[5:7], date_str[8:]
+    if not (year.isdigit() and month.isdigit() and day.isdigit()):
+        return False
+
+    try:
+        datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return False  # out of range, e.g. 2022-02-30
+    return True
+
+
+@functools.lru_cache(maxsize=16384)
+def _parse_tags(tags_str):
+    """
+    Split a | separated tags string into a frozenset of interned tags. Rows
+    repeat the same few combinations, so the results are cached and equal
+    strings share one frozenset.
+    """
+    return frozenset(map(sys.intern, tags_str.split('|')))
+
+
+def _parse_amount(amount):
+    """
+    Convert an amount from a transaction or a db record into a float. Raise
+    InvalidFieldValueError if it isn't a number.
+    """
+    try:
+        return float(amount)
+    except (TypeError, ValueError):
+        raise InvalidFieldValueError(f'Invalid value {amount} for amount')
+
+
+@functools.lru_cache(maxsize=4096)
+def _collection_from_date(date_str):
+    """
+    Return the YYYY/MM collection namespace for the given date. There are
+    only a few distinct months, so the results are cached.
+    """
+    return f'{date_str[:4]}/{date_str[5:7]}'
+
+
+@functools.lru_cache(maxsize=256)
+def _collections_from_date_range(from_str, to_str):
+    """
+    Return a tuple with the YYYY/MM collection namespaces between the given
+    dates. Queries tend to repeat the same ranges, so the results are cached.
+    """
+    from_year, from_month = (int(part) for part in from_str.split('-')[:2])
+    to_year, to_month = (int(part) for part in to_str.split('-')[:2])
+    # count months since year 0 so the range is a single integer range
+    start = from_year * 12 + from_month - 1
+    end = to_year * 12 + to_month - 1
+    return tuple(
+        f'{month // 12}/{month % 12 + 1:02d}'
+        for month in range(start, end + 1)
+    )
+
+
 class TransacError(Error):
     """Base class for all errors in this module."""
     def __init__(self, msg):
@@ -53,7 +132,13 @@ class Transaction:
     DATE = 'date'
     AMOUNT = 'amount'
     EMAIL_ID = 'email_id'
-    SUPPORTED_TYPES = {'income', 'outcome'}
+    FIELDS = frozenset({ID, TYPE, TAGS, DATE, AMOUNT, EMAIL_ID})
+    SUPPORTED_TYPES = frozenset({'income', 'outcome'})
+    # fetch all the required values from kwargs with a single call
+    REQUIRED_FIELDS = operator.itemgetter(TYPE, TAGS, DATE, AMOUNT)
+    __slots__ = (
+        'id', 'type', '_tags', '_tags_str', 'date', 'amount', 'email_id'
+    )
 
     def __init__(self, **kwargs):
         """Do input validation on arguments and initialize fields.
@@ -64,57 +149,79 @@ class Transaction:
         Args:
             id (str):         a guid
             type (str):       transaction type (income/outcome)
-            tags (str):       a | separated list of words
+            tags (str):       a | separated list of words, stored as a
+                                frozenset shared with equal transactions
             date (str):       a date with YYYY-MM-DD format
             amount (float):   a floating point number representing
                                 the exchanged amount
             email_id (str):   an id generated by the email provider
         """
-        try:
-            if kwargs[self.TYPE] in self.SUPPORTED_TYPES:
-                self.type = kwargs[self.TYPE]
-            else:
-                raise InvalidFieldValueError(
-                    f'Invalid value {kwargs[self.TYPE]} for type'
-                )
-
-            try:
-                self.tags = set(kwargs[self.TAGS].split('|'))
-            except AttributeError:
-                raise InvalidFieldValueError(
-                    f'Invalid value {kwargs[self.TAGS]} for tags'
-                )
+        self.load(kwargs)
 
-            try:
-                datetime.datetime.strptime(kwargs[self.DATE], '%Y-%m-%d')
-                self.date = kwargs[self.DATE]
-            except ValueError:
-                raise InvalidFieldValueError(
-                    f'Invalid value {kwargs[self.DATE]} for date'
-                )
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a Transaction instance from a dictionary, like a db record,
+        without copying it into keyword arguments first.
+        """
+        transaction = cls.__new__(cls)
+        transaction.load(data)
+        return transaction
 
-            try:
-                self.amount = float(kwargs[self.AMOUNT])
-            except ValueError:
-                raise InvalidFieldValueError(
-                    f"Invalid value {kwargs[self.AMOUNT]} for amount"
-                )
+    def load(self, data):
+        """
+        Validate the values from the given dictionary and initialize fields.
+        See __init__ for the expected keys.
+        """
+        try:
+            t_type, t_tags, t_date, t_amount = self.REQUIRED_FIELDS(data)
         except KeyError as key_error:
             raise MissingFieldError(f'Missing required arg: {key_error}')
 
-        self.id = kwargs[self.ID] if self.ID in kwargs else uuid.uuid4().hex
-        self.email_id = kwargs.get(self.EMAIL_ID)
+        if t_type not in self.SUPPORTED_TYPES:
+            raise InvalidFieldValueError(f'Invalid value {t_type} for type')
+        self.type = sys.intern(t_type)
+
+        if not isinstance(t_tags, str):
+            raise InvalidFieldValueError(f'Invalid value {t_tags} for tags')
+
+        self._tags = _parse_tags(t_tags)
+        # keep the raw string so serialize doesn't need to join the tags
+        self._tags_str = t_tags
+
+        if not _is_valid_date(t_date):
+            raise InvalidFieldValueError(f'Invalid value {t_date} for date')
+        self.date = t_date
+
+        self.amount = _parse_amount(t_amount)
+        self.id = data[self.ID] if self.ID in data else uuid.uuid4().hex
+        self.email_id = data.get(self.EMAIL_ID)
+
+    @property
+    def tags(self):
+        """
+        The frozenset of tags describing the transaction.
+        """
+        return self._tags
+
+    @tags.setter
+    def tags(self, tags):
+        self._tags = tags
+        self._tags_str = None
 
     def serialize(self):  # TODO: find a better method to generate this dict
         """
         Convert the transaction instance into a dictionary.
         """
+        tags_str = self._tags_str
+        if tags_str is None:
+            tags_str = self._tags_str = '|'.join(self._tags)
         return {
             self.ID: self.id,
             self.TYPE: self.type,
             self.DATE: self.date,
             self.AMOUNT: self.amount,
-            self.TAGS: '|'.join(self.tags),
+            self.TAGS: tags_str,
             self.EMAIL_ID: self.email_id
         }
 
@@ -122,8 +229,9 @@ class Transaction:
         """
         Return a human-readable representation of the transaction instance.
         """
+        # print tags as a plain set, the frozenset is an internal detail
         return f'{self.id}\t{self.date}\t{self.type}\t{self.amount}'\
-            f'\t{self.tags}\t{self.email_id}'
+            f'\t{set(self.tags)}\t{self.email_id}'
 
 
 class TransactionManager:
@@ -138,8 +246,92 @@ class TransactionManager:
         Initialize instance.
         """
         self._logger = LoggingHelper.get_logger(self.__class__.__name__)
-        self._db = db if db else DbFactory.get_db('csv')()
+        self._db = db if db else DbFactory.get_shared_db('csv')
         self._transaction_email_ids = set()
+        self._email_id_collections = set()
+        self._pending_transactions = None
+        self._pending_changes = None
+        self._batch_depth = 0
+
+    def __enter__(self):
+        """
+        Start a batch of changes. Transactions saved, updated or removed
+        inside the batch are kept in memory and written to db at once when
+        it ends. Nested batches join the outermost one.
+        """
+        if self._batch_depth == 0:
+            self._pending_transactions = {}
+            self._pending_changes = {}
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Write the changes made during the batch to db when the outermost
+        batch ends. They are discarded if it ended with an error.
+        """
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return False
+
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self._pending_transactions = None
+            self._pending_changes = None
+        return False
+
+    def flush(self):
+        """
+        Write the changes buffered in the current batch to db, rewriting each
+        affected collection only once.
+        """
+        if self._pending_changes is None:
+            return
+
+        pending_changes = self._pending_changes
+        pending_transactions = self._pending_transactions
+        self._pending_changes = {}
+        self._pending_transactions = {}
+        for collection, changes in pending_changes.items():
+            self.write_changes(collection, changes)
+        if pending_transactions:
+            self.write_transactions(list(pending_transactions.values()))
+
+    def write_changes(self, collection, changes):
+        """Apply updates and removals to a collection in a single rewrite.
+        Updated transactions that aren't in the collection yet, like the ones
+        moved from another month, are added at the end.
+
+        Args:
+            collection (str): The collection to be rewritten
+            changes (dict): Maps transaction ids to their new record, or to
+                None if the transaction must be removed
+        """
+        self._logger.debug(
+            'writing %s changes to %s', len(changes), collection
+        )
+        try:
+            records = self._db.get_records(collection)
+        except MissingCollectionError:
+            records = []
+
+        field_names = list(records[0].keys()) if records else None
+        changes = dict(changes)
+        new_records = []
+        for record in records:
+            record_id = record[Transaction.ID]
+            if record_id in changes:
+                record = changes.pop(record_id)
+                if record is None:
+                    continue
+            new_records.append(record)
+        new_records.extend(
+            record for record in changes.values() if record is not None
+        )
+        if records or new_records:
+            self._db.write_records(new_records, collection, field_names)
 
     def calculate_collection_from_date(self, date_str):
         """
@@ -148,8 +340,7 @@ class TransactionManager:
         namespace has the following pattern: YYYY/MM (2022/01)
         """
         self._logger.debug('calculating collection namespace for %s', date_str)
-        date_parts = date_str.split('-')
-        return f'{date_parts[0]}/{date_parts[1]}'
+        return _collection_from_date(date_str)
 
     def calculate_collections_from_date_range(self, from_str, to_str):
         """
@@ -161,46 +352,26 @@ class TransactionManager:
             from_str,
             to_str
         )
-        from_parts = from_str.split('-')
-        to_parts = to_str.split('-')
-        initial_year = int(from_parts[0])
-        month = int(from_parts[1])
-        year = initial_year
-        year_limit = int(to_parts[0])
-        month_limit = int(to_parts[1])
-        collections = []
-
-        while True:
-            if month > month_limit and year == year_limit:  # stop the loop
-                break
-            elif month == 13:  # reset month and increase year
-                month = 1
-                year += 1
-            else:  # calculate namespace for year and month
-                date_str = f'{year}-{"0" if month < 10 else ""}{month}'
-                collection = self.calculate_collection_from_date(date_str)
-                collections.append(collection)
-                month += 1
-
-        return collections
-
-    def create_transaction_list(self, dicts):
-        """
-        Create a list of Transaction instances from a list of dictionaries.
-        """
-        return [Transaction(**d) for d in dicts]
+        return list(_collections_from_date_range(from_str, to_str))
 
     def load_transaction_email_ids(self, collection):
         """
         Load transaction email ids into memory so that we can check for
-        existence before inserting it.
+        existence before inserting it. Each collection is only read once,
+        the ids of the transactions saved later are added as they're written.
         """
+        if collection in self._email_id_collections:
+            return
+
         try:
-            records = self._db.get_records(collection)
-            txs = self.create_transaction_list(records)
-            self._transaction_email_ids.update([tx.email_id for tx in txs])
+            # only the email id is needed, don't build transactions for it
+            email_ids = self._db.iter_field_values(
+                Transaction.EMAIL_ID, collection
+            )
+            self._transaction_email_ids.update(filter(None, email_ids))
         except MissingCollectionError:
             pass # this is OK, there are no transactions yet
+        self._email_id_collections.add(collection)
 
     def save_transaction(self, transaction):
         """Save a transaction in db.
@@ -210,68 +381,175 @@ class TransactionManager:
         """
         # TODO: need to get db type from cfg
         self._logger.debug('saving transaction in db')
-        collection = self.calculate_collection_from_date(transaction.date)
-        self.load_transaction_email_ids(collection)
-        if transaction.email_id not in self._transaction_email_ids:
-            self._db.add_record(
-                record=transaction.serialize(),
-                collection=collection
-            )
-        else:
-            self._logger.debug('ignoring duplicate transaction')
+        self.save_transactions([transaction])
+
+    def save_transactions(self, transactions):
+        """Save a list of transactions in db, writing each collection only
+        once. Inside a batch the transactions are only buffered, and a
+        transaction saved twice is written once with its last values.
+
+        Args:
+            transactions (list): Transaction objects to be saved in db
+        """
+        if self._pending_transactions is None:
+            self.write_transactions(transactions)
+            return
+
+        for transaction in transactions:
+            self._pending_transactions[transaction.id] = transaction
+
+    def write_transactions(self, transactions):
+        """Write a list of transactions to db, skipping the ones whose email
+        was already saved.
+
+        Args:
+            transactions (list): Transaction objects to be saved in db
+        """
+        self._logger.debug('saving %s transactions in db', len(transactions))
+        records_per_collection = {}
+        for transaction in transactions:
+            collection = _collection_from_date(transaction.date)
+            if collection not in records_per_collection:
+                self.load_transaction_email_ids(collection)
+                records_per_collection[collection] = []
+
+            if transaction.email_id in self._transaction_email_ids:
+                self._logger.debug('ignoring duplicate transaction')
+                continue
+
+            records_per_collection[collection].append(transaction.serialize())
+            if transaction.email_id:
+                # avoid saving the same email twice within this batch
+                self._transaction_email_ids.add(transaction.email_id)
+
+        for collection, records in records_per_collection.items():
+            self._db.add_records(records, collection)
+
+    @staticmethod
+    def get_filter_values(value):
+        """
+        Return the values accepted by a filter as a frozenset. A filter value
+        can be a single value or a collection of accepted values.
+        """
+        if isinstance(value, (set, frozenset, list, tuple)):
+            return frozenset(value)
+        return frozenset((value,))
 
     def filter_transactions(self, transactions, filters):
         """
-        Filter a list of transaction based on a set of key-values
+        Filter a list of transaction based on a set of key-values. The
+        filters are parsed like in create_record_filter and compiled into
+        (getter, values, is_tags) checks, so that every field is checked with
+        a single set operation.
         """
+        plan = [
+            (operator.attrgetter(key), values, key == Transaction.TAGS)
+            for key, values in self.compile_filters(filters)
+        ]
+        if len(plan) == 1:
+            # a single filter key needs no per-transaction loop over the plan
+            getter, values, is_tags = plan[0]
+            if is_tags:
+                isdisjoint = values.isdisjoint
+                return [t for t in transactions if not isdisjoint(getter(t))]
+            return [t for t in transactions if getter(t) in values]
+
         result = []
         # collect transactions matching any filter value only
         for transaction in transactions:
-            for key, value in filters.items():
-                try:
-                    if key == Transaction.TAGS:
-                        match = value & transaction.tags
-                    else:
-                        match = value == getattr(transaction, key)
-
-                    if match:
-                        result.append(transaction)
-                        break
-                except InvalidFieldError:
-                    pass  # no problem, field doesn't exists
+            for getter, values, is_tags in plan:
+                if is_tags:
+                    match = not values.isdisjoint(getter(transaction))
+                else:
+                    match = getter(transaction) in values
+
+                if match:
+                    result.append(transaction)
+                    break
 
         return result
 
-    def get_transactions(self, from_date, to_date, filters=None):
-        """Get transactions from db and apply a set of filters.
+    def compile_filters(self, filters):
+        """
+        Return a list of (key, values) pairs with the accepted values of each
+        filter as a frozenset. Keys that aren't transaction fields are dropped.
+        """
+        return [
+            (key, self.get_filter_values(value))
+            for key, value in filters.items()
+            if key in Transaction.FIELDS
+        ]
+
+    def create_record_filter(self, filters):
+        """
+        Compile a set of key-values into a function that tells whether a db
+        record matches any of them. Working on the raw records means that
+        Transaction instances only need to be created for the records that
+        match. Raise InvalidFieldValueError if a record has an invalid amount.
+        """
+        checks = []
+        for key, values in self.compile_filters(filters):
+            if key == Transaction.TAGS:
+                checks.append(
+                    lambda record, values=values:
+                        not values.isdisjoint(
+                            record[Transaction.TAGS].split('|')
+                        )
+                )
+            elif key == Transaction.AMOUNT:
+                # records keep the amount as a string
+                checks.append(
+                    lambda record, values=values:
+                        _parse_amount(record[Transaction.AMOUNT]) in values
+                )
+            else:
+                checks.append(
+                    lambda record, key=key, values=values:
+                        record[key] in values
+                )
+
+        # match records matching any filter value only
+        return lambda record: any(check(record) for check in checks)
+
+    def iter_transactions(self, from_date, to_date, filters=None):
+        """Yield the transactions from db that match a set of filters one at
+        a time, without loading all of them into memory.
         """
         self._logger.debug(
-            'getting transactions from db using filters = %s', filters
+            'iterating transactions from db using filters = %s', filters
         )
         collections = self.calculate_collections_from_date_range(
             from_date, to_date
         )
-        records = []
+        # let the db skip the records that don't match while reading them
+        predicate = self.create_record_filter(filters) if filters else None
         for collection in collections:
             try:
-                records += self._db.get_records(collection)
+                for record in self._db.iter_records(collection, predicate):
+                    yield Transaction.from_dict(record)
             except MissingCollectionError:
                 # no problem, log message and continue with next collection
                 self._logger.debug('collection not found: %s', collection)
 
-        transactions = self.create_transaction_list(records)
-
-        if filters:
-            transactions = self.filter_transactions(transactions, filters)
-
-        return transactions
+    def get_transactions(self, from_date, to_date, filters=None):
+        """Get transactions from db and apply a set of filters.
+        """
+        return list(self.iter_transactions(from_date, to_date, filters))
 
     def remove_transaction(self, date_str, guid_str):
         """Make sure that data contains a value for id field and use it
         to remove a transaction from db.
         """
         self._logger.debug('removing transaction %s', guid_str)
+        if not _is_valid_date(date_str):
+            raise InvalidFieldValueError(f'Invalid value {date_str} for date')
+
         collection = self.calculate_collection_from_date(date_str)
+        if self._pending_changes is not None:
+            self._pending_transactions.pop(guid_str, None)
+            self._pending_changes.setdefault(collection, {})[guid_str] = None
+            return
+
         self._db.remove_record(
             Transaction.ID,
             guid_str,
@@ -285,26 +563,52 @@ class TransactionManager:
         different.
         """
         self._logger.debug('checking if record needs to be moved')
-        old_date_parts = old_date_str.split('-')
-        new_date_parts = new_date_str.split('-')
-        return old_date_parts[0] != new_date_parts[0] or \
-            old_date_parts[1] != new_date_parts[1]
+        # dates have YYYY-MM-DD format, compare the YYYY-MM prefix
+        return old_date_str[:7] != new_date_str[:7]
 
     def update_transaction(self, old_date_str, data):
         """Update a transaction in db by using the provided id and data.
         """
         self._logger.debug('updating transaction %s with %s', data.id, data)
-        if isinstance(data, Transaction):
-            if self.check_need_to_move_record(old_date_str, data.date):
-                self.remove_transaction(old_date_str, data.id)
-                self.save_transaction(data)
-            else:
-                collection = self.calculate_collection_from_date(data.date)
-                self._db.edit_record(
-                    Transaction.ID,
-                    data.id,
-                    data.serialize(),
-                    collection
+        if not isinstance(data, Transaction):
+            raise InvalidTransactionError('invalid transaction object')
+        if not _is_valid_date(old_date_str):
+            raise InvalidFieldValueError(
+                f'Invalid value {old_date_str} for date'
+            )
+
+        collection = self.calculate_collection_from_date(data.date)
+        need_to_move = self.check_need_to_move_record(old_date_str, data.date)
+        if self._pending_changes is not None:
+            if data.id in self._pending_transactions:
+                self._pending_transactions[data.id] = data
+                return
+
+            if need_to_move:
+                old_collection = self.calculate_collection_from_date(
+                    old_date_str
                 )
+                self._pending_changes.setdefault(
+                    old_collection, {}
+                )[data.id] = None
+            self._pending_changes.setdefault(
+                collection, {}
+            )[data.id] = data.serialize()
+            return
+
+        if need_to_move:
+            # the transaction is already saved, don't check its email again
+            self._db.move_record(
+                Transaction.ID,
+                data.id,
+                data.serialize(),
+                self.calculate_collection_from_date(old_date_str),
+                collection
+            )
         else:
-            raise InvalidTransactionError('invalid transaction object')
+            self._db.edit_record(
+                Transaction.ID,
+                data.id,
+                data.serialize(),
+                collection
+            )
@@ -1,20 +1,20 @@
-import os
+import atexit
+import shutil
 import pathlib
+import tempfile
 
 
-PARENT_DIR = pathlib.Path(os.path.dirname(os.path.realpath(__file__))).parent
-TEST_DB_PATH = PARENT_DIR.joinpath('.fintool/')
+# each test run gets its own db dir so that runs can't interfere
+TEST_DB_PATH = pathlib.Path(tempfile.mkdtemp(prefix='fintool-test-'))
 
 def remove_dir(dir_path):
     """
     Recursively remove directory.
     """
     try:
-        for f in dir_path.glob("*"):
-            if f.is_file():
-                f.unlink()
-            else:
-                remove_dir(f)
-        dir_path.rmdir()
+        shutil.rmtree(dir_path)
     except FileNotFoundError:
         pass  # db doesn't exists
+
+
+atexit.register(remove_dir, TEST_DB_PATH)
@@ -5,6 +5,11 @@ import fintool.actions
 
 class TestCLI(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # parsing doesn't change the cli, build it once for all tests
+        cls.cli = fintool.cli.CLI()
+
     def test_parse_add_tx_cmd(self):
         expected = {
             'cmd': 'txs',
@@ -28,8 +33,7 @@ class TestCLI(unittest.TestCase):
             "a,b,c"
         ]
 
-        cli = fintool.cli.CLI()
-        actual = cli.parse_args(cmd)
+        actual = self.cli.parse_args(cmd)
 
         self.assertEqual(actual, expected)
 
@@ -43,8 +47,7 @@ class TestCLI(unittest.TestCase):
 
         cmd = ['txs', 'remove', '--id', '1', '--date', '2020-01-01']
 
-        cli = fintool.cli.CLI()
-        actual = cli.parse_args(cmd)
+        actual = self.cli.parse_args(cmd)
 
         self.assertEqual(actual, expected)
 
@@ -74,8 +77,7 @@ class TestCLI(unittest.TestCase):
             "a|b|c"
         ]
 
-        cli = fintool.cli.CLI()
-        actual = cli.parse_args(cmd)
+        actual = self.cli.parse_args(cmd)
 
         self.assertEqual(actual, expected)
 
@@ -114,8 +116,7 @@ class TestCLI(unittest.TestCase):
             "something"
         ]
 
-        cli = fintool.cli.CLI()
-        actual = cli.parse_args(cmd)
+        actual = self.cli.parse_args(cmd)
 
         self.assertEqual(actual, expected)
 
@@ -148,8 +149,7 @@ class TestCLI(unittest.TestCase):
             "a,b,c"
         ]
 
-        cli = fintool.cli.CLI()
-        actual = cli.parse_args(cmd)
+        actual = self.cli.parse_args(cmd)
 
         self.assertEqual(actual, expected)
 
@@ -160,7 +160,7 @@ class TestCLI(unittest.TestCase):
         ]
         expected_cmd = fintool.cli.Command("txs.add", expected_actions, None)
         args = {'cmd': 'txs', 'action': 'add', 'other': None}
-        actual = fintool.cli.CLI().create_cmd(args)
+        actual = self.cli.create_cmd(args)
 
         self.assertEqual(actual.cmd, expected_cmd.cmd)
         self.assertEqual(actual.actions, expected_cmd.actions)
@@ -173,7 +173,7 @@ class TestCLI(unittest.TestCase):
             None
         )
         args = {'cmd': 'txs', 'action': 'remove', 'other': None}
-        actual = fintool.cli.CLI().create_cmd(args)
+        actual = self.cli.create_cmd(args)
 
         self.assertEqual(actual.cmd, expected_cmd.cmd)
         self.assertEqual(actual.actions, expected_cmd.actions)
@@ -187,7 +187,7 @@ class TestCLI(unittest.TestCase):
 
         expected_cmd = fintool.cli.Command("txs.list", expected_actions, None)
         args = {'cmd': 'txs', 'action': 'list', 'other': None}
-        actual = fintool.cli.CLI().create_cmd(args)
+        actual = self.cli.create_cmd(args)
 
         self.assertEqual(actual.cmd, expected_cmd.cmd)
         self.assertEqual(actual.actions, expected_cmd.actions)
@@ -204,7 +204,7 @@ class TestCLI(unittest.TestCase):
         expected_cmd = fintool.cli.Command("txs.edit", expected_actions, None)
 
         args = {'cmd': 'txs', 'action': 'edit', 'other': None}
-        actual = fintool.cli.CLI().create_cmd(args)
+        actual = self.cli.create_cmd(args)
 
         self.assertEqual(actual.cmd, expected_cmd.cmd)
         self.assertEqual(actual.actions, expected_cmd.actions)
@@ -225,7 +225,7 @@ class TestCLI(unittest.TestCase):
         expected_cmd = fintool.cli.Command("tags.add", expected_actions, None)
 
         args = {'cmd': 'tags', 'action': 'add', 'other': None}
-        actual = fintool.cli.CLI().create_cmd(args)
+        actual = self.cli.create_cmd(args)
 
         self.assertEqual(actual.cmd, expected_cmd.cmd)
         self.assertEqual(actual.actions, expected_cmd.actions)
@@ -238,7 +238,7 @@ class TestCLI(unittest.TestCase):
         expected_cmd = fintool.cli.Command("tags.edit", expected_actions, None)
 
         args = {'cmd': 'tags', 'action': 'edit', 'other': None}
-        actual = fintool.cli.CLI().create_cmd(args)
+        actual = self.cli.create_cmd(args)
 
         self.assertEqual(actual.cmd, expected_cmd.cmd)
         self.assertEqual(actual.actions, expected_cmd.actions)
@@ -254,7 +254,7 @@ class TestCLI(unittest.TestCase):
         )
 
         args = {'cmd': 'tags', 'action': 'remove', 'other': None}
-        actual = fintool.cli.CLI().create_cmd(args)
+        actual = self.cli.create_cmd(args)
 
         self.assertEqual(actual.cmd, expected_cmd.cmd)
         self.assertEqual(actual.actions, expected_cmd.actions)
@@ -271,7 +271,7 @@ class TestCLI(unittest.TestCase):
         )
 
         args = {'cmd': 'tags', 'action': 'list', 'other': None}
-        actual = fintool.cli.CLI().create_cmd(args)
+        actual = self.cli.create_cmd(args)
 
         self.assertEqual(actual.cmd, expected_cmd.cmd)
         self.assertEqual(actual.actions, expected_cmd.actions)
@@ -293,8 +293,7 @@ class TestCLI(unittest.TestCase):
             "a|b|c"
         ]
 
-        cli = fintool.cli.CLI()
-        actual = cli.parse_args(cmd)
+        actual = self.cli.parse_args(cmd)
 
         self.assertEqual(actual, expected)
 
@@ -318,8 +317,7 @@ class TestCLI(unittest.TestCase):
             "some_id"
         ]
 
-        cli = fintool.cli.CLI()
-        actual = cli.parse_args(cmd)
+        actual = self.cli.parse_args(cmd)
 
         self.assertEqual(actual, expected)
 
@@ -337,8 +335,7 @@ class TestCLI(unittest.TestCase):
             "some_id"
         ]
 
-        cli = fintool.cli.CLI()
-        actual = cli.parse_args(cmd)
+        actual = self.cli.parse_args(cmd)
 
         self.assertEqual(actual, expected)
 
@@ -347,7 +344,6 @@ class TestCLI(unittest.TestCase):
 
         cmd = ["tags", "list"]
 
-        cli = fintool.cli.CLI()
-        actual = cli.parse_args(cmd)
+        actual = self.cli.parse_args(cmd)
 
         self.assertEqual(actual, expected)
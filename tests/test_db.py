@@ -1,4 +1,5 @@
 import unittest
+import unittest.mock
 
 import fintool.db
 
@@ -49,6 +50,27 @@ class TestCsvDb(unittest.TestCase):
             "file doesn't contains expected record"
         )
 
+    def test_add_records(self):
+        expected_content = 'a,b\n1,2\n3,4\n5,6\n'
+
+        self.FILE_DB.add_records(
+            [{'a': 1, 'b': 2}, {'a': 3, 'b': 4}],
+            self.RECORDS_COLLECTION
+        )
+        self.FILE_DB.add_records(
+            [{'a': 5, 'b': 6}],
+            self.RECORDS_COLLECTION
+        )
+
+        with self.RECORDS_FILE.open() as f:
+            actual_content = f.read()
+
+        self.assertEqual(
+            actual_content,
+            expected_content,
+            "file doesn't match expected content"
+        )
+
     def test_remove_record(self):
         expected_content = 'a,b,c\n1,2,"[\'a\', \'b\', \'c\']"\n'
 
@@ -108,6 +130,66 @@ class TestCsvDb(unittest.TestCase):
             "file doesn't match expected content"
         )
 
+    def test_iter_records(self):
+        expected = [{'a': '1', 'b': '2'}, {'a': '2', 'b': '3'}]
+
+        self.FILE_DB.add_records(
+            [{'a': 1, 'b': 2}, {'a': 2, 'b': 3}],
+            self.RECORDS_COLLECTION
+        )
+
+        actual = self.FILE_DB.iter_records(self.RECORDS_COLLECTION)
+
+        self.assertEqual(list(actual), expected, "records don't match")
+
+    def test_get_records_with_predicate(self):
+        expected = [{'a': '2', 'b': '3'}]
+
+        self.FILE_DB.add_records(
+            [{'a': 1, 'b': 2}, {'a': 2, 'b': 3}, {'a': 3, 'b': 4}],
+            self.RECORDS_COLLECTION
+        )
+
+        actual = self.FILE_DB.get_records(
+            self.RECORDS_COLLECTION,
+            predicate=lambda record: record['b'] == '3'
+        )
+
+        self.assertEqual(actual, expected, "records don't match")
+
+    def test_iter_records_missing_collection(self):
+        with self.assertRaises(fintool.db.MissingCollectionError):
+            next(self.FILE_DB.iter_records(self.RECORDS_COLLECTION))
+
+    def test_iter_field_values(self):
+        self.FILE_DB.add_records(
+            [{'a': 1, 'b': 2}, {'a': 2, 'b': 3}],
+            self.RECORDS_COLLECTION
+        )
+
+        self.assertEqual(
+            list(self.FILE_DB.iter_field_values('b', self.RECORDS_COLLECTION)),
+            ['2', '3']
+        )
+        self.assertEqual(
+            list(self.FILE_DB.iter_field_values('c', self.RECORDS_COLLECTION)),
+            []
+        )
+
+    def test_find_record(self):
+        expected = {'a': '2', 'b': '3'}
+
+        self.FILE_DB.add_records(
+            [{'a': 1, 'b': 2}, {'a': 2, 'b': 3}, {'a': 3, 'b': 4}],
+            self.RECORDS_COLLECTION
+        )
+
+        actual = self.FILE_DB.find_record('a', '2', self.RECORDS_COLLECTION)
+        missing = self.FILE_DB.find_record('a', '4', self.RECORDS_COLLECTION)
+
+        self.assertEqual(actual, expected)
+        self.assertIsNone(missing)
+
     def test_edit_record(self):
         expected_content = 'a,b,c\n1,3,[\'a\']\n'
 
@@ -130,3 +212,74 @@ class TestCsvDb(unittest.TestCase):
             expected_content,
             "file doesn't match expected content"
         )
+
+    def test_upsert_record(self):
+        expected_content = 'a,b\n1,2\n2,5\n3,4\n'
+
+        self.FILE_DB.upsert_record(
+            id_field='a',
+            id_value='1',
+            record={'a': 1, 'b': 2},
+            collection=self.RECORDS_COLLECTION
+        )
+        self.FILE_DB.add_records(
+            [{'a': 2, 'b': 3}],
+            self.RECORDS_COLLECTION
+        )
+        self.FILE_DB.upsert_record(
+            id_field='a',
+            id_value='2',
+            record={'a': 2, 'b': 5},
+            collection=self.RECORDS_COLLECTION
+        )
+        self.FILE_DB.upsert_record(
+            id_field='a',
+            id_value='3',
+            record={'a': 3, 'b': 4},
+            collection=self.RECORDS_COLLECTION
+        )
+
+        with self.RECORDS_FILE.open() as f:
+            actual_content = f.read()
+
+        self.assertEqual(
+            actual_content,
+            expected_content,
+            "file doesn't match expected content"
+        )
+
+    def test_write_records(self):
+        expected_content = 'a,b\n3,4\n5,6\n'
+
+        self.FILE_DB.add_records(
+            [{'a': 1, 'b': 2}],
+            self.RECORDS_COLLECTION
+        )
+        self.FILE_DB.write_records(
+            [{'a': 3, 'b': 4}, {'a': 5, 'b': 6}],
+            self.RECORDS_COLLECTION
+        )
+
+        with self.RECORDS_FILE.open() as f:
+            actual_content = f.read()
+
+        self.assertEqual(
+            actual_content,
+            expected_content,
+            "file doesn't match expected content"
+        )
+
+    def test_get_shared_db(self):
+        # don't create the default db dir in the user's home
+        patcher = unittest.mock.patch.object(
+            fintool.db.CsvDb, 'HOMEDIR', str(TEST_DB_PATH)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(fintool.db.DbFactory._shared_dbs.clear)
+
+        first = fintool.db.DbFactory.get_shared_db('csv')
+        second = fintool.db.DbFactory.get_shared_db('csv')
+
+        self.assertIsInstance(first, fintool.db.CsvDb)
+        self.assertIs(first, second, "db object is not shared")
@@ -0,0 +1,110 @@
+import unittest
+
+from fintool.email import Email, BanamexEmailParser, build_parser
+
+
+def create_banamex_email(uid, rows):
+    """
+    Create a Banamex-like html email with one table cell per string.
+    """
+    cells = ''.join(f'<td>{row}</td>' for row in rows)
+    return Email(uid, f'<html><body><table><tr>{cells}</tr></table></body>'
+                      f'<p>Footer</p></html>')
+
+
+class TestBanamexEmailParser(unittest.TestCase):
+    """Test Banamex email parsing.
+    """
+    def assert_transaction_email(self, actual, expected):
+        self.assertEqual(
+            (actual.concept, actual.date, actual.amount, actual.email_id),
+            expected
+        )
+
+    def test_parse_email(self):
+        email = create_banamex_email('1', [
+            'Retiro/Compra',
+            'Establecimiento:',
+            'OXXO',
+            '$ 1,234.50',
+            'Fecha y hora:',
+            '05/01/22 10:00'
+        ])
+
+        actual = BanamexEmailParser().parse_email(email)
+
+        self.assert_transaction_email(
+            actual,
+            ('OXXO', '2022-01-05', '1234.50', '1')
+        )
+
+    def test_parse_email_repeated_markers(self):
+        # the values of the first complete set of markers are used
+        email = create_banamex_email('1', [
+            'Retiro/Compra',
+            'Establecimiento:',
+            'OXXO',
+            '$100.00',
+            'Fecha y hora:',
+            '05/01/22 10:00',
+            'Establecimiento:',
+            'OTHER',
+            '$200.00',
+            'Fecha y hora:',
+            '06/01/22 10:00'
+        ])
+
+        actual = BanamexEmailParser().parse_email(email)
+
+        self.assert_transaction_email(
+            actual,
+            ('OXXO', '2022-01-05', '100.00', '1')
+        )
+
+    def test_parse_email_markers_order(self):
+        email = create_banamex_email('1', [
+            'Fecha y hora:',
+            '2022/01/05 10:00',
+            '$1,000.00',
+            'Establecimiento:',
+            'OXXO',
+            'Retiro/Compra'
+        ])
+
+        actual = BanamexEmailParser().parse_email(email)
+
+        self.assert_transaction_email(
+            actual,
+            ('OXXO', '2022-01-05', '1000.00', '1')
+        )
+
+    def test_reuse_parser(self):
+        parser = build_parser('banamex')
+
+        self.assertIs(parser, build_parser('banamex'))
+
+        first = parser.parse_email(create_banamex_email('1', [
+            'Retiro/Compra',
+            'Establecimiento:',
+            'OXXO',
+            '$100.00',
+            'Fecha y hora:',
+            '05/01/22 10:00'
+        ]))
+        second = parser.parse_email(create_banamex_email('2', [
+            'Fecha y hora:',
+            '06/01/22 11:00',
+            'Establecimiento:',
+            'OTHER',
+            '$200.00',
+            'Retiro/Compra'
+        ]))
+
+        self.assert_transaction_email(
+            first,
+            ('OXXO', '2022-01-05', '100.00', '1')
+        )
+        self.assert_transaction_email(
+            second,
+            ('OTHER', '2022-01-06', '200.00', '2')
+        )
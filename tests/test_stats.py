@@ -131,3 +131,43 @@ class TestStats(unittest.TestCase):
         actual = stats_helper.create_overall_summary()
 
         self.assertEqual(expected, actual.get_data())
+        with self.assertRaises(KeyError):
+            actual.get_data()[2024]
+        self.assertNotIn(2024, actual.get_data())
+
+    def test_amounts_per_tag(self):
+        expected = {
+            'food': [501, 601, 0, 412, 500],
+            'fresko': [0, 200.5, 0, 412, 500],
+            'transportation': [0, 0, 700.5, 0, 100.5],
+            'uber': [501, 400.5, 700.5, 0, 100.5]
+        }
+
+        stats_helper = StatsHelper(self.transactions)
+        actual = stats_helper.create_overall_summary()
+
+        self.assertEqual(expected, actual.amounts_per_tag)
+
+    def test_amounts_per_tag_rounding(self):
+        transactions = [
+            Transaction(**{
+                'type': 'outcome',
+                'date': '2022-01-01',
+                'amount': '2.675',
+                'tags': 'food'
+            }),
+            Transaction(**{
+                'type': 'outcome',
+                'date': '2022-02-01',
+                'amount': '1234.565',
+                'tags': 'food'
+            })
+        ]
+
+        stats_helper = StatsHelper(transactions)
+        actual = stats_helper.create_overall_summary()
+
+        # chart values must match the totals printed in the report
+        self.assertEqual(actual.amounts_per_tag, {'food': [2.67, 1234.57]})
+        self.assertIn('food:\t2.67\n', str(actual))
+        self.assertIn('food:\t1234.57\n', str(actual))
@@ -0,0 +1,88 @@
+import unittest
+
+from fintool.db import CsvDb
+from fintool.email import TransactionEmail
+from fintool.sync import SyncManager, LastSync
+from fintool.tagging import Tag, TagManager
+from tests.fixtures.util import remove_dir, TEST_DB_PATH
+
+
+class TestSyncManager(unittest.TestCase):
+    """Test sync module.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.DB_DIR = TEST_DB_PATH
+        cls.FILE_DB = CsvDb(homedir=TEST_DB_PATH)
+
+    def setUp(self):
+        remove_dir(self.DB_DIR)
+        self.sync_manager = SyncManager(db=self.FILE_DB)
+
+    def read_collection(self, collection):
+        return self.DB_DIR.joinpath(f'{collection}.csv').read_text()
+
+    def test_tag_transactions(self):
+        untagged = [
+            ('OXXO', '2022-01-05', '10.5', 'e1'),
+            ('UBER', '2022-01-06', '20', 'e2'),
+            ('NOPE', '2022-01-07', '3', 'e3'),
+            ('OXXO', '2022-01-08', '1', 'e4')
+        ]
+        self.FILE_DB.add_records(
+            [TransactionEmail(*values).serialize() for values in untagged],
+            SyncManager.UNTAGGED_COLLECTION
+        )
+        tag_manager = TagManager(db=self.FILE_DB)
+        tag_manager.add_tag(Tag(concept='OXXO', tags_str='food'))
+        tag_manager.add_tag(Tag(concept='UBER', tags_str='transport|uber'))
+
+        self.sync_manager.tag_transactions()
+
+        pending = self.read_collection(SyncManager.PENDING_COLLECTION)
+        self.assertEqual(
+            pending.splitlines()[0],
+            'concept,date,amount,email_id,tags',
+            "pending columns don't match"
+        )
+        records = self.FILE_DB.get_records(SyncManager.PENDING_COLLECTION)
+        self.assertEqual(
+            [
+                (record['email_id'], set(record['tags'].split('|')))
+                for record in records
+            ],
+            [('e1', {'food'}), ('e2', {'transport', 'uber'}), ('e4', {'food'})]
+        )
+        self.assertEqual(
+            self.read_collection(SyncManager.UNTAGGED_COLLECTION),
+            'concept,date,amount,email_id,tags\n'
+            'NOPE,2022-01-07,3,e3,\n',
+            "untagged file doesn't match"
+        )
+
+    def test_update_last_sync(self):
+        collection = SyncManager.LAST_SYNC
+        first = LastSync.build_target('gmail', 'banamex', 'inbox')
+        second = LastSync.build_target('gmail', 'heybanco', 'inbox')
+
+        self.sync_manager.update_last_sync(first, 1, collection)
+        self.sync_manager.update_last_sync(second, 2, collection)
+        self.sync_manager.update_last_sync(first, 3, collection)
+
+        self.assertEqual(
+            self.FILE_DB.get_records(collection),
+            [
+                {'last_sync': '3', 'target': first},
+                {'last_sync': '2', 'target': second}
+            ]
+        )
+        # a new manager reads the last syncs from db
+        sync_manager = SyncManager(db=self.FILE_DB)
+        self.assertEqual(
+            sync_manager.get_last_sync(first, collection).last_sync,
+            3
+        )
+        self.assertEqual(
+            sync_manager.get_last_sync(second, collection).last_sync,
+            2
+        )
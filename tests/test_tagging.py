@@ -117,6 +117,25 @@ class TestTagging(unittest.TestCase):
             expected[2]
         ), 'tags not equal')
 
+    def test_get_tag_copy(self):
+        """
+        Make sure that changing a tag passed to or returned by TagManager
+        doesn't change the tags it keeps in memory.
+        """
+        self.add_tags(self.SAMPLE_TAGS[:1])
+        tag = self.tag_manager.get_tag(self.SAMPLE_TAGS[0].id)
+        tag.tags.add('z')
+        new_tag = Tag(concept='b', tags_str='x')
+        self.tag_manager.add_tag(new_tag)
+        new_tag.tags.add('z')
+
+        self.assertEqual(
+            self.tag_manager.get_tag(self.SAMPLE_TAGS[0].id).tags,
+            {'a', 'b', 'c'}
+        )
+        self.assertEqual(self.tag_manager.match_concpet('a'), {'a', 'b', 'c'})
+        self.assertEqual(self.tag_manager.match_concpet('b'), {'x'})
+
     def test_get_tags(self):
         """
         Make sure that TagManager can retrieve all tags from db.
@@ -162,3 +181,60 @@ class TestTagging(unittest.TestCase):
         actual = self.tag_manager.match_concpet('d')
 
         self.assertEqual(actual, expected)
+
+    def test_match_concept_after_changes(self):
+        """
+        Make sure that TagManager keeps matching the right tags after tags
+        are added, updated or deleted.
+        """
+        self.add_tags(self.SAMPLE_TAGS[:2])
+        self.tag_manager.match_concpet('a')  # load tags into memory
+
+        new_tag = Tag(concept='c', tags_str='x')
+        self.tag_manager.add_tag(new_tag)
+        self.assertEqual(self.tag_manager.match_concpet('c'), {'x'})
+
+        new_tag.concept = 'd'
+        self.tag_manager.update_tag(new_tag)
+        self.assertEqual(self.tag_manager.match_concpet('c'), None)
+        self.assertEqual(self.tag_manager.match_concpet('d'), {'x'})
+        self.assertEqual(self.tag_manager.get_tag(new_tag.id).concept, 'd')
+
+        self.tag_manager.delete_tag(self.SAMPLE_TAGS[0].id)
+        self.assertEqual(self.tag_manager.match_concpet('a'), None)
+        self.assertEqual(self.tag_manager.match_concpet('b'), {'b', 'c', 'd'})
+
+    def test_batch_changes(self):
+        """
+        Make sure that TagManager writes the changes made inside a batch to
+        db only when the batch ends.
+        """
+        self.add_tags(self.SAMPLE_TAGS[:1])
+        new_tag = Tag(concept='b', tags_str='x')
+        with self.tag_manager as tag_manager:
+            tag_manager.add_tag(new_tag)
+            tag_manager.delete_tag(self.SAMPLE_TAGS[0].id)
+            self.assertEqual(len(self.FILE_DB.get_records('tags')), 1)
+            self.assertEqual(tag_manager.match_concpet('b'), {'x'})
+
+        actual = self.tag_manager.get_tags()
+        self.assertEqual(len(actual), 1)
+        self.assertTrue(self.match_tags(actual[0], new_tag), 'tags not equal')
+
+    def test_nested_batch_changes(self):
+        """
+        Make sure that a nested batch doesn't reload the tags or write them to
+        db before the outermost batch ends.
+        """
+        self.add_tags(self.SAMPLE_TAGS[:1])
+        new_tag = Tag(concept='b', tags_str='x')
+        with self.tag_manager as tag_manager:
+            tag_manager.delete_tag(self.SAMPLE_TAGS[0].id)
+            with tag_manager:
+                tag_manager.add_tag(new_tag)
+            self.assertEqual(len(self.FILE_DB.get_records('tags')), 1)
+            self.assertIsNone(tag_manager.match_concpet('a'))
+
+        actual = self.tag_manager.get_tags()
+        self.assertEqual(len(actual), 1)
+        self.assertTrue(self.match_tags(actual[0], new_tag), 'tags not equal')
@@ -1,7 +1,11 @@
 import unittest
 
 from fintool.db import CsvDb
-from fintool.transac import Transaction, TransactionManager
+from fintool.transac import (
+    Transaction,
+    TransactionManager,
+    InvalidFieldValueError
+)
 from tests.fixtures.util import remove_dir, TEST_DB_PATH
 
 
@@ -39,6 +43,46 @@ class TestTransactions(unittest.TestCase):
         self.assertEqual(actual.amount, expected['amount'])
         self.assertEqual(actual.tags, expected['tags'])
 
+    def test_create_transaction_invalid_date(self):
+        data = {
+            'type': 'income',
+            'amount': '12.3',
+            'tags': 'a|b|c'
+        }
+
+        # validation results are cached, make sure they are still rejected
+        for date in ['2022-02-30', '2022-02-30', '2022-1-05', '01-05-2022']:
+            with self.assertRaises(InvalidFieldValueError):
+                Transaction(date=date, **data)
+
+    def test_serialize_transaction(self):
+        transaction = Transaction(**{
+            'type': 'income',
+            'date': '2022-01-05',
+            'amount': '12.3',
+            'tags': 'c|a|b'
+        })
+
+        self.assertEqual(transaction.serialize()['tags'], 'c|a|b')
+
+        transaction.tags = frozenset({'d'})
+
+        self.assertEqual(transaction.serialize()['tags'], 'd')
+
+    def test_transaction_str(self):
+        transaction = Transaction(**{
+            'id': '1',
+            'type': 'income',
+            'date': '2022-01-05',
+            'amount': '12.3',
+            'tags': 'a'
+        })
+
+        self.assertEqual(
+            str(transaction),
+            "1\t2022-01-05\tincome\t12.3\t{'a'}\tNone"
+        )
+
     def test_save_transaction(self):
         """Just make sure that the test doesn't raises any error since
         other tests already validate db contents.
@@ -53,6 +97,168 @@ class TestTransactions(unittest.TestCase):
 
         self.transaction_manager.save_transaction(actual)
 
+    def test_save_transactions(self):
+        from_str = '2022-01-01'
+        to_str = '2022-02-28'
+
+        self.transaction_manager.save_transactions([
+            Transaction(**{
+                'type': 'outcome',
+                'date': '2022-01-01',
+                'amount': '12.3',
+                'tags': 'a',
+                'email_id': 'x1'
+            }),
+            Transaction(**{
+                'type': 'outcome',
+                'date': '2022-02-01',
+                'amount': '10',
+                'tags': 'b',
+                'email_id': 'x2'
+            }),
+            Transaction(**{
+                'type': 'outcome',
+                'date': '2022-01-01',
+                'amount': '12.3',
+                'tags': 'a',
+                'email_id': 'x1'
+            })
+        ])
+        actual = self.transaction_manager.get_transactions(from_str, to_str)
+
+        self.assertEqual(
+            [tx.email_id for tx in actual],
+            ['x1', 'x2'],
+            "duplicate transaction email was saved"
+        )
+
+    def test_save_transactions_already_in_db(self):
+        from_str = '2022-01-01'
+        to_str = '2022-01-31'
+        data = {
+            'type': 'outcome',
+            'date': '2022-01-01',
+            'amount': '12.3',
+            'tags': 'a'
+        }
+        TransactionManager(db=self.FILE_DB).save_transactions([
+            Transaction(email_id='y1', **data),
+            Transaction(**data)
+        ])
+
+        # a new manager needs to read the email ids from db
+        transaction_manager = TransactionManager(db=self.FILE_DB)
+        transaction_manager.save_transactions([
+            Transaction(email_id='y1', **data),
+            Transaction(**data)
+        ])
+        actual = transaction_manager.get_transactions(from_str, to_str)
+
+        self.assertEqual(
+            [tx.email_id for tx in actual],
+            ['y1', '', ''],
+            "duplicate transaction email was saved"
+        )
+
+    def test_save_transactions_in_batch(self):
+        from_str = '2022-01-01'
+        to_str = '2022-01-31'
+        transaction = Transaction(**{
+            'type': 'outcome',
+            'date': '2022-01-01',
+            'amount': '12.3',
+            'tags': 'a'
+        })
+
+        with self.transaction_manager as transaction_manager:
+            transaction_manager.save_transaction(transaction)
+            self.assertEqual(
+                transaction_manager.get_transactions(from_str, to_str),
+                [],
+                "transaction was written before the batch ended"
+            )
+            transaction.amount = 10.0
+            transaction_manager.save_transaction(transaction)
+
+        actual = self.transaction_manager.get_transactions(from_str, to_str)
+
+        self.assertEqual([tx.amount for tx in actual], [10.0])
+
+    def test_nested_batches(self):
+        from_str = '2022-01-01'
+        to_str = '2022-01-31'
+        first, second, third = [
+            Transaction(**{
+                'type': 'outcome',
+                'date': date,
+                'amount': '12.3',
+                'tags': 'a'
+            })
+            for date in ['2022-01-01', '2022-01-02', '2022-01-03']
+        ]
+        transaction_manager = TransactionManager(db=self.FILE_DB)
+
+        with transaction_manager:
+            with transaction_manager:
+                transaction_manager.save_transaction(first)
+            self.assertEqual(
+                transaction_manager.get_transactions(from_str, to_str),
+                [],
+                "inner batch wrote before the outer batch ended"
+            )
+            transaction_manager.save_transaction(second)
+
+        with self.assertRaises(ValueError):
+            with transaction_manager:
+                transaction_manager.save_transaction(third)
+                raise ValueError('discard batch')
+
+        actual = transaction_manager.get_transactions(from_str, to_str)
+
+        self.assertEqual(
+            [tx.date for tx in actual],
+            ['2022-01-01', '2022-01-02']
+        )
+
+    def test_change_transactions_in_batch(self):
+        from_str = '2022-01-01'
+        to_str = '2022-01-31'
+        transactions = [
+            Transaction(**{
+                'type': 'outcome',
+                'date': '2022-01-0{}'.format(day),
+                'amount': '1.0',
+                'tags': 'a'
+            })
+            for day in range(1, 4)
+        ]
+        self.transaction_manager.save_transactions(transactions)
+
+        with self.transaction_manager as transaction_manager:
+            transactions[0].amount = 5.0
+            transaction_manager.update_transaction(
+                '2022-01-01', transactions[0]
+            )
+            transactions[0].amount = 7.0
+            transaction_manager.update_transaction(
+                '2022-01-01', transactions[0]
+            )
+            transaction_manager.remove_transaction(
+                '2022-01-02', transactions[1].id
+            )
+            self.assertEqual(
+                len(transaction_manager.get_transactions(from_str, to_str)),
+                3,
+                "changes were written before the batch ended"
+            )
+
+        actual = self.transaction_manager.get_transactions(from_str, to_str)
+
+        self.assertEqual(
+            [(tx.id, tx.amount) for tx in actual],
+            [(transactions[0].id, 7.0), (transactions[2].id, 1.0)]
+        )
+
     def test_get_transactions(self):
         from_str = '2022-01-01'
         to_str = '2023-01-01'
@@ -176,6 +382,26 @@ class TestTransactions(unittest.TestCase):
                 "transaction tags not equal"
             )
 
+    def test_get_transactions_invalid_amount(self):
+        self.FILE_DB.add_records(
+            [{
+                'id': '1',
+                'type': 'income',
+                'date': '2022-01-01',
+                'amount': 'abc',
+                'tags': 'a',
+                'email_id': ''
+            }],
+            '2022/01'
+        )
+
+        with self.assertRaises(InvalidFieldValueError):
+            self.transaction_manager.get_transactions(
+                '2022-01-01',
+                '2022-01-31',
+                {'amount': 10.0}
+            )
+
     def test_get_transactions_by_tags(self):
         from_str = '2022-01-01'
         to_str = '2023-01-01'
@@ -236,6 +462,72 @@ class TestTransactions(unittest.TestCase):
                 "transaction tags not equal"
             )
 
+    def test_filter_transactions(self):
+        transactions = [
+            Transaction(**{
+                'type': 'income',
+                'date': '2022-01-01',
+                'amount': '12.3',
+                'tags': 'a|b'
+            }),
+            Transaction(**{
+                'type': 'outcome',
+                'date': '2022-01-02',
+                'amount': '10',
+                'tags': 'c'
+            }),
+            Transaction(**{
+                'type': 'outcome',
+                'date': '2022-01-03',
+                'amount': '5',
+                'tags': 'b|d'
+            })
+        ]
+
+        actual = self.transaction_manager.filter_transactions(
+            transactions,
+            {'tags': {'b'}, 'amount': 10.0, 'unknown': 'x'}
+        )
+
+        self.assertEqual(
+            actual,
+            transactions,
+            "filtered transactions not equal"
+        )
+
+        actual = self.transaction_manager.filter_transactions(
+            transactions,
+            {'type': 'income'}
+        )
+
+        self.assertEqual(
+            actual,
+            transactions[:1],
+            "filtered transactions not equal"
+        )
+
+        actual = self.transaction_manager.filter_transactions(
+            transactions,
+            {'date': {'2022-01-01', '2022-01-03'}}
+        )
+
+        self.assertEqual(
+            actual,
+            [transactions[0], transactions[2]],
+            "filtered transactions not equal"
+        )
+
+        actual = self.transaction_manager.filter_transactions(
+            transactions,
+            {'tags': 'b'}
+        )
+
+        self.assertEqual(
+            actual,
+            [transactions[0], transactions[2]],
+            "filtered transactions not equal"
+        )
+
     def test_remove_transaction(self):
         from_str = '2022-01-01'
         to_str = '2022-01-01'
@@ -258,6 +550,23 @@ class TestTransactions(unittest.TestCase):
 
         self.assertEqual(actual, expected, "transaction list not equal")
 
+    def test_change_transaction_invalid_date(self):
+        transaction = Transaction(**{
+            'type': 'income',
+            'date': '2022-01-05',
+            'amount': '12.3',
+            'tags': 'a'
+        })
+
+        with self.assertRaises(InvalidFieldValueError):
+            self.transaction_manager.remove_transaction(
+                '2022-1-5', transaction.id
+            )
+        with self.assertRaises(InvalidFieldValueError):
+            self.transaction_manager.update_transaction(
+                '2022-1-5', transaction
+            )
+
     def test_edit_transaction(self):
         from_str = '2022-01-01'
         to_str = '2022-02-02'
@@ -318,6 +627,48 @@ class TestTransactions(unittest.TestCase):
             "transaction tags not equal"
         )
 
+    def test_move_transaction(self):
+        transaction_manager = TransactionManager(db=self.FILE_DB)
+        transaction = Transaction(**{
+            'type': 'outcome',
+            'date': '2022-01-10',
+            'amount': '12.3',
+            'tags': 'a',
+            'email_id': 'z1'
+        })
+        transaction_manager.save_transaction(transaction)
+
+        transaction.date = '2022-02-10'
+        transaction_manager.update_transaction('2022-01-10', transaction)
+
+        self.assertEqual(
+            transaction_manager.get_transactions('2022-01-01', '2022-01-31'),
+            []
+        )
+        actual = transaction_manager.get_transactions(
+            '2022-02-01', '2022-02-28'
+        )
+
+        self.assertEqual(
+            [tx.email_id for tx in actual],
+            ['z1'],
+            "moved transaction was not saved"
+        )
+
+        with transaction_manager:
+            transaction.date = '2022-01-10'
+            transaction_manager.update_transaction('2022-02-10', transaction)
+
+        actual = transaction_manager.get_transactions(
+            '2022-01-01', '2022-02-28'
+        )
+
+        self.assertEqual(
+            [(tx.date, tx.email_id) for tx in actual],
+            [('2022-01-10', 'z1')],
+            "moved transaction was not saved"
+        )
+
     def test_calculate_namespace_from_date(self):
         """
         Make sure that TransactionManager knows how to create a collection
@@ -371,6 +722,18 @@ class TestTransactions(unittest.TestCase):
 
         self.assertEqual(a, b, 'list of namespaces not equal')
 
+    def test_calculate_namespaces_from_reversed_date_range(self):
+        """
+        Make sure that TransactionManager returns no namespaces when the
+        range ends before it starts.
+        """
+        b = self.transaction_manager.calculate_collections_from_date_range(
+            '2023-01-01',
+            '2022-04-01'
+        )
+
+        self.assertEqual(b, [], 'list of namespaces not empty')
+
     def test_check_need_to_move_record_month(self):
         """
         Make sure that the TransactionManager can detect when to move a record.